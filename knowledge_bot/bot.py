@@ -5,8 +5,18 @@ This server implements a configurable bot that exposes a knowledge base as resou
 and provides action tools for support workflows.
 """
 
+import atexit
+import functools
 import json
-from typing import List, Dict, Optional
+import logging
+import logging.handlers
+import pickle
+import queue
+import re
+import tempfile
+from collections import defaultdict
+from dataclasses import dataclass, fields
+from typing import List, Dict, FrozenSet, Optional, Tuple
 from mcp.server.fastmcp import FastMCP, Context
 
 # Initialize FastMCP
@@ -18,6 +28,28 @@ import os
 # Get the directory where bot.py is located
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 CONFIG_PATH = os.path.join(BASE_DIR, "config.json")
+# On-disk snapshot of the built knowledge base and search index
+SNAPSHOT_PATH = os.path.join(BASE_DIR, "config.cache.pkl")
+# Bump whenever the snapshot layout changes, to discard older snapshots
+SNAPSHOT_VERSION = 10
+
+logger = logging.getLogger(__name__)
+
+def start_log_listener() -> None:
+    """
+    Routes the mock action logs through a queue, written to stderr by a
+    background thread, so tool calls do not block on console output
+    (records are still formatted on the calling thread). Only called when
+    running this file as the server; when it is imported, e.g. by
+    `mcp run`, the host's logging configuration applies.
+    """
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    log_listener = logging.handlers.QueueListener(log_queue, logging.StreamHandler())
+    log_listener.start()
+    atexit.register(log_listener.stop)
 
 def load_config() -> Dict:
     try:
@@ -26,8 +58,166 @@ def load_config() -> Dict:
     except FileNotFoundError:
         return {"error": f"Config file not found at {CONFIG_PATH}"}
 
-config = load_config()
-KNOWLEDGE_BASE = {item["id"]: item for item in config.get("knowledge", [])}
+@functools.lru_cache(maxsize=1)
+def get_config() -> Dict:
+    """
+    Returns the parsed configuration. The file is read on first use rather
+    than at import, so the server starts without waiting on it.
+    """
+    return load_config()
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+@dataclass(slots=True)
+class Article:
+    """
+    A knowledge base article, with the fields derived from it for search
+    and display precomputed.
+    """
+    id: str
+    title: str
+    content: str
+    tags: Tuple[str, ...]
+    # Lowercased words of the title, content and tags
+    token_set: FrozenSet[str]
+    # "[id] title" line returned by searches
+    summary: str
+    # Full text returned by knowledge://{article_id}
+    rendered: str
+
+def _build_snapshot() -> Dict:
+    """
+    Builds the knowledge base, its search index and the rendered index
+    listing and persona prompt from the configuration. Each article's
+    search text, summary line and rendered text are precomputed once so
+    that searches and reads do not rebuild them per request.
+    """
+    config = get_config()
+    kb: Dict[str, Article] = {}
+
+    for item in config.get("knowledge", []):
+        k_id = item["id"]
+        title = item["title"]
+        content = item["content"]
+        tags = item.get("tags", [])
+
+        article = Article(
+            id=k_id,
+            title=title,
+            content=content,
+            tags=tuple(tags),
+            token_set=frozenset(TOKEN_PATTERN.findall(
+                (title + " " + content + " " + " ".join(tags)).lower()
+            )),
+            summary=f"[{k_id}] {title}",
+            rendered=f"""
+Title: {title}
+Tags: {', '.join(tags)}
+---------------------------------------------------
+{content}
+""",
+        )
+        kb[k_id] = article
+
+    # Inverted index: token -> IDs of the articles containing it, in order.
+    # Built from kb rather than per config row, so that a duplicated ID
+    # indexes only the article that kb (and the scan) actually keeps
+    inverted: Dict[str, List[str]] = defaultdict(list)
+    for k_id, article in kb.items():
+        for token in article.token_set:
+            inverted[token].append(k_id)
+
+    persona = config.get("persona", "You are a helpful assistant.")
+    constraints = "\n".join(config.get("constraints", []))
+
+    return {
+        "version": SNAPSHOT_VERSION,
+        "knowledge": kb,
+        # Article summaries and token sets as parallel lists, in knowledge
+        # base order, for the search scan
+        "summaries": [article.summary for article in kb.values()],
+        "token_sets": [article.token_set for article in kb.values()],
+        # Rendered knowledge://index listing
+        "listing": "\n".join(
+            f"- [{k_id}] {article.title} (Tags: {', '.join(article.tags)})"
+            for k_id, article in kb.items()
+        ),
+        "inverted": dict(inverted),
+        # Rendered bot_persona prompt
+        "persona": f"""
+{persona}
+
+{constraints}
+""",
+    }
+
+ARTICLE_FIELDS = tuple(field.name for field in fields(Article))
+
+def _write_snapshot(snapshot: Dict) -> None:
+    # Articles are stored as tuples of their field values rather than as
+    # Article objects: pickling a class records its module path, which is
+    # '__main__' or cannot be imported at all depending on how bot.py was
+    # loaded (e.g. `mcp run` loads it without a sys.modules entry)
+    data = dict(snapshot)
+    data["knowledge"] = [
+        tuple(getattr(article, name) for name in ARTICLE_FIELDS)
+        for article in snapshot["knowledge"].values()
+    ]
+
+    # Write to a temporary file first so readers never see a partial snapshot
+    fd, tmp_path = tempfile.mkstemp(dir=BASE_DIR, prefix="config.cache.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(data, f, protocol=5)
+        os.replace(tmp_path, SNAPSHOT_PATH)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+@functools.lru_cache(maxsize=1)
+def _get_snapshot() -> Dict:
+    """
+    Returns the built knowledge base and search index, on first use. They
+    are saved to SNAPSHOT_PATH keyed by the config file's modification
+    time, so later starts load them with a single pickle.load instead of
+    parsing and indexing the config again.
+    """
+    try:
+        mtime = os.stat(CONFIG_PATH).st_mtime_ns
+    except OSError:
+        return _build_snapshot()
+
+    try:
+        with open(SNAPSHOT_PATH, "rb") as f:
+            snapshot = pickle.load(f)
+        if (
+            snapshot.get("version") == SNAPSHOT_VERSION
+            and snapshot.get("mtime") == mtime
+        ):
+            snapshot["knowledge"] = {
+                row[0]: Article(*row) for row in snapshot["knowledge"]
+            }
+            return snapshot
+    except Exception:
+        # Missing, stale or unreadable snapshot: rebuild it below
+        pass
+
+    snapshot = _build_snapshot()
+    snapshot["mtime"] = mtime
+    try:
+        _write_snapshot(snapshot)
+    except Exception:
+        # The snapshot is only an optimization (e.g. the directory may be
+        # read-only, or a value may not pickle): keep serving the in-memory
+        # build
+        pass
+    return snapshot
+
+def get_kb() -> Dict[str, Article]:
+    """
+    Returns the knowledge base keyed by article ID.
+    """
+    return _get_snapshot()["knowledge"]
 
 # -----------------------------------------------------------------------------
 # Resources: Knowledge Base
@@ -39,78 +229,115 @@ def list_knowledge() -> str:
     Returns a list of all available knowledge base articles with their IDs and titles.
     Use this to discover what information is available.
     """
-    summary = []
-    for k_id, item in KNOWLEDGE_BASE.items():
-        summary.append(f"- [{k_id}] {item['title']} (Tags: {', '.join(item.get('tags', []))})")
-    return "\n".join(summary)
+    return _get_snapshot()["listing"]
 
 @mcp.resource("knowledge://{article_id}")
 def get_knowledge_article(article_id: str) -> str:
     """
     Retrieves the full content of a specific knowledge base article by its ID.
     """
-    article = KNOWLEDGE_BASE.get(article_id)
+    article = get_kb().get(article_id)
     if not article:
         return f"Error: Article with ID '{article_id}' not found."
     
-    return f"""
-Title: {article['title']}
-Tags: {', '.join(article.get('tags', []))}
----------------------------------------------------
-{article['content']}
-"""
+    return article.rendered
 
 # -----------------------------------------------------------------------------
 # Tools: Search & Actions
 # -----------------------------------------------------------------------------
 
+@functools.lru_cache(maxsize=512)
+def _tokenize(query: str) -> Tuple[str, ...]:
+    """
+    Returns the sorted, de-duplicated lowercase terms of a query, the form
+    used as the `_search_cached` key.
+    """
+    return tuple(sorted(set(TOKEN_PATTERN.findall(query.lower()))))
+
+def _scan(
+    query_set: FrozenSet[str],
+    summaries: List[str],
+    token_sets: List[FrozenSet[str]],
+    limit: int,
+) -> List[str]:
+    """
+    Returns the summaries of up to `limit` articles containing ALL words
+    of `query_set`, in knowledge base order. If there are none, returns
+    those containing ANY of them instead, marked as partial matches.
+    Partial matches are collected in the same pass.
+
+    This is the search hot loop; it only uses concretely typed lists, sets
+    and strings so that it can be compiled with mypyc or Cython as is.
+    """
+    results: List[str] = []
+    partial: List[str] = []
+
+    for i in range(len(token_sets)):
+        token_set = token_sets[i]
+        if query_set <= token_set:
+            results.append(summaries[i])
+            if len(results) >= limit:
+                break
+        elif (
+            not results
+            and len(partial) < limit
+            and not query_set.isdisjoint(token_set)
+        ):
+            partial.append(summaries[i] + " (Partial Match)")
+
+    return results or partial
+
+@functools.lru_cache(maxsize=1024)
+def _search_cached(query_terms: Tuple[str, ...], limit: int) -> Tuple[str, ...]:
+    """
+    Runs a search for the given sorted, de-duplicated query terms, keeping
+    at most `limit` results. Results are cached since the knowledge base
+    does not change while the server runs; call
+    `_search_cached.cache_clear()` if the snapshot is ever reloaded.
+    """
+    if not query_terms:
+        return ("No matching articles found.",)
+
+    snapshot = _get_snapshot()
+
+    if len(query_terms) == 1:
+        # A single term has no partial matches, so its postings are the
+        # whole answer
+        kb = snapshot["knowledge"]
+        results = [
+            kb[k_id].summary
+            for k_id in snapshot["inverted"].get(query_terms[0], [])[:limit]
+        ]
+    else:
+        results = _scan(
+            frozenset(query_terms),
+            snapshot["summaries"],
+            snapshot["token_sets"],
+            limit,
+        )
+
+    if not results:
+        return ("No matching articles found.",)
+
+    return tuple(results)
+
 @mcp.tool()
-def search_knowledge(query: str) -> List[str]:
+def search_knowledge(query: str, limit: int = 20) -> List[str]:
     """
     CRITICAL: You MUST use this tool FIRST for ANY user question regarding the platform (e.g., password, login, API, billing).
     Do NOT answer from your own internal knowledge. 
     Even if you think you know the answer, you MUST verify it with this tool first.
     Search the knowledge base for articles matching the query.
-    Returns a list of matching article summaries (ID and Title).
+    Returns a list of at most `limit` matching article summaries (ID and Title).
+    `limit` must be at least 1.
     
     IMPORTANT: After finding a relevant article ID (e.g., 'kb-001'), you MUST then 
     read its content using the `read_knowledge_article` tool to answer the user's question.
     """
-    query_terms = query.lower().split()
-    results = []
-    
-    for k_id, item in KNOWLEDGE_BASE.items():
-        # Search in title, content, and tags
-        text_to_search = (
-            item["title"].lower() + 
-            " " + 
-            item["content"].lower() + 
-            " " + 
-            " ".join(item.get("tags", [])).lower()
-        )
-        
-        # Check if ALL terms in the query are present in the text
-        if all(term in text_to_search for term in query_terms):
-            results.append(f"[{k_id}] {item['title']}")
-            
-    if not results:
-        # Fallback: Check if ANY term is present (for partial matches)
-        for k_id, item in KNOWLEDGE_BASE.items():
-            text_to_search = (
-                item["title"].lower() + " " + 
-                item["content"].lower() + " " + 
-                " ".join(item.get("tags", [])).lower()
-            )
-            if any(term in text_to_search for term in query_terms):
-                results.append(f"[{k_id}] {item['title']} (Partial Match)")
-        
-        # Remove duplicates if any (though logic above separates them)
-        results = list(set(results))
+    if limit < 1:
+        return [f"Error: limit must be at least 1, got {limit}."]
 
-    if not results:
-        return ["No matching articles found."]
-        
-    return results
+    return list(_search_cached(_tokenize(query), limit))
 
 @mcp.tool()
 def read_knowledge_article(article_id: str) -> str:
@@ -129,7 +356,7 @@ def create_ticket(title: str, description: str, priority: str = "normal") -> str
     """
     # In a real app, this would connect to Jira/Zendesk
     ticket_id = f"TICKET-{len(title)}" # Mock ID
-    print(f"Creating Ticket: {title} ({priority})")
+    logger.info("Creating Ticket: %s (%s)", title, priority)
     return f"Ticket created successfully. Ticket ID: {ticket_id}. Our team will review it shortly."
 
 @mcp.tool()
@@ -139,7 +366,7 @@ def update_record(record_id: str, data: Dict[str, str]) -> str:
     Use this to change user preferences, contact info, etc.
     """
     # Mock update
-    print(f"Updating Record {record_id} with {data}")
+    logger.info("Updating Record %s with %s", record_id, data)
     return f"Record {record_id} updated successfully with: {json.dumps(data)}"
 
 @mcp.tool()
@@ -149,7 +376,7 @@ def send_notification(user_id: str, message: str, channel: str = "email") -> str
     Channels: 'email', 'sms', 'in-app'.
     """
     # Mock notification
-    print(f"Sending {channel} to {user_id}: {message}")
+    logger.info("Sending %s to %s: %s", channel, user_id, message)
     return f"Notification sent to {user_id} via {channel}."
 
 @mcp.tool()
@@ -158,7 +385,7 @@ def escalate_to_human(reason: str, context: str) -> str:
     Escalate the conversation to a human agent.
     Use this when the user is frustrated, asks for a human, or the issue is too complex.
     """
-    print(f"ESCALATION TRIGGERED: {reason}")
+    logger.info("ESCALATION TRIGGERED: %s", reason)
     return "I have flagged this conversation for a human agent. They will join shortly. Is there anything else I can check while we wait?"
 
 # -----------------------------------------------------------------------------
@@ -171,14 +398,8 @@ def bot_persona() -> str:
     Returns the configured persona and instructions for the bot.
     Claude should use this to understand its role.
     """
-    persona = config.get("persona", "You are a helpful assistant.")
-    constraints = "\n".join(config.get("constraints", []))
-    
-    return f"""
-{persona}
-
-{constraints}
-"""
+    return _get_snapshot()["persona"]
 
 if __name__ == "__main__":
+    start_log_listener()
     mcp.run(transport="streamable-http")
@@ -5,6 +5,8 @@ Run:
     uv run main.py
 """
 
+import operator
+from functools import reduce
 from typing import List, Dict, Tuple
 from mcp.server.fastmcp import FastMCP
 
@@ -23,6 +25,42 @@ SCHEDULES: Dict[str, List[Tuple[int, int]]] = {}
 WORK_START = 9
 WORK_END = 18
 
+# Per-person availability as a bitmask, bit i set if hour WORK_START + i is
+# free, kept in sync with SCHEDULES by add_busy_time
+FREE_MASK: Dict[str, int] = {}
+
+FREE_DAY = (1 << (WORK_END - WORK_START)) - 1
+
+
+# -----------------------------
+# Helpers: availability masks
+# -----------------------------
+def busy_bits(start: int, end: int) -> int:
+    """
+    Return the mask bits covered by a busy slot, clamped to working hours
+    """
+    lo = max(start, WORK_START) - WORK_START
+    hi = min(end, WORK_END) - WORK_START
+    return ((1 << max(hi - lo, 0)) - 1) << lo
+
+
+def mask_to_slots(mask: int) -> List[Tuple[int, int]]:
+    """
+    Return the runs of set bits in a free mask as (start, end) hours
+    """
+    slots = []
+
+    while mask:
+        # Lowest free hour, then the number of consecutive free hours from it
+        lo = (mask & -mask).bit_length() - 1
+        run = mask >> lo
+        length = (~run & (run + 1)).bit_length() - 1
+
+        slots.append((WORK_START + lo, WORK_START + lo + length))
+        mask &= ~(((1 << length) - 1) << lo)
+
+    return slots
+
 
 # -----------------------------
 # Tool: Add busy time
@@ -35,28 +73,12 @@ def add_busy_time(name: str, start: int, end: int) -> str:
     """
     if name not in SCHEDULES:
         SCHEDULES[name] = []
+        FREE_MASK[name] = FREE_DAY
 
     SCHEDULES[name].append((start, end))
-    return f"Added busy time for {name}: {start}:00–{end}:00"
-
-
-# -----------------------------
-# Helper: get free slots
-# -----------------------------
-def get_free_slots(busy: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
-    busy.sort()
-    free = []
-    current = WORK_START
-
-    for start, end in busy:
-        if start > current:
-            free.append((current, start))
-        current = max(current, end)
-
-    if current < WORK_END:
-        free.append((current, WORK_END))
+    FREE_MASK[name] &= ~busy_bits(start, end)
 
-    return free
+    return f"Added busy time for {name}: {start}:00–{end}:00"
 
 
 # -----------------------------
@@ -67,25 +89,13 @@ def find_common_free_time(members: List[str]) -> List[str]:
     """
     Find common free time slots for given members
     """
-    all_free_slots = []
-
-    for member in members:
-        busy = SCHEDULES.get(member, [])
-        free = get_free_slots(busy)
-        all_free_slots.append(free)
-
-    # Intersect free slots
-    common = all_free_slots[0]
-
-    for slots in all_free_slots[1:]:
-        new_common = []
-        for a_start, a_end in common:
-            for b_start, b_end in slots:
-                start = max(a_start, b_start)
-                end = min(a_end, b_end)
-                if start < end:
-                    new_common.append((start, end))
-        common = new_common
+    if not members:
+        return []
+
+    # An hour is common free time if its bit is set in every member's mask
+    mask = reduce(operator.and_, (FREE_MASK.get(m, FREE_DAY) for m in members))
+
+    common = mask_to_slots(mask)
 
     return [f"{s}:00–{e}:00" for s, e in common]
 